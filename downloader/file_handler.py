@@ -218,7 +218,7 @@ class FileHandler:
             for file_name in text_files:
                 file_path = os.path.join(self.input_path, file_name)
                 with open(file_path, "r") as f:
-                    urls = [url.strip() for url in f.readlines() if url.strip()]
+                    urls = [url for url in map(str.strip, f) if url]
                     video_ids = [extract_video_id(url) for url in urls]
                     all_video_ids.update(vid for vid in video_ids if vid)
             
@@ -226,7 +226,7 @@ class FileHandler:
             all_saves_path = os.path.join(self.input_path, self.all_saves_file)
             if os.path.exists(all_saves_path):
                 with open(all_saves_path, "r") as f:
-                    urls = [url.strip() for url in f.readlines() if url.strip()]
+                    urls = [url for url in map(str.strip, f) if url]
                     # Only count videos that weren't in regular collections
                     new_video_ids = [extract_video_id(url) for url in urls]
                     all_video_ids.update(vid for vid in new_video_ids 
@@ -234,7 +234,7 @@ class FileHandler:
         
         elif os.path.isfile(self.input_path):
             with open(self.input_path, "r") as f:
-                urls = [url.strip() for url in f.readlines() if url.strip()]
+                urls = [url for url in map(str.strip, f) if url]
                 video_ids = [extract_video_id(url) for url in urls]
                 all_video_ids.update(vid for vid in video_ids if vid)
         
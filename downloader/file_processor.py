@@ -162,8 +162,10 @@ def process_error_logs(input_path, file_handler, selenium_handlers,
         skip_sync: Whether to skip syncing the processed folder
     """
     print("\nProcessing error logs...")
-    error_files = [f for f in os.listdir(input_path) 
-                  if f.startswith(file_handler.error_prefix) and f.endswith('.txt')]
+    with os.scandir(input_path) as it:
+        error_files = [entry.name for entry in it
+                       if entry.name.startswith(file_handler.error_prefix) and entry.name.endswith('.txt')
+                       and entry.is_file()]
     
     if not error_files:
         print("No error logs found.")
@@ -184,7 +186,7 @@ def process_error_logs(input_path, file_handler, selenium_handlers,
         
         # Read all URLs initially
         with open(error_file_path, 'r') as f:
-            failed_urls = [url.strip() for url in f.readlines() if url.strip()]
+            failed_urls = [url for url in map(str.strip, f) if url]
         
         # Track if we've made any successful downloads
         had_success = False
@@ -1,20 +1,60 @@
 """Google Drive sync functionality."""
 
 import os
+import shutil
 import subprocess
+import tempfile
 import threading
-from queue import Queue
-import shlex
-from urllib.parse import quote
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty
+
+MAX_CONCURRENT_SYNCS = 4  # Maximum number of rclone processes run at once by wait_for_syncs
+RCLONE_OUTPUT_TAIL_LINES = 200  # Number of trailing rclone output lines kept for error reporting
+
+def _is_empty(path):
+    """Check whether a directory is empty, stopping at its first entry."""
+    with os.scandir(path) as it:
+        return next(it, None) is None
+
+def _rename_hidden_files(folder_path):
+    """Rename files whose names start with a period or space so they sync as visible, stable names."""
+    renames = []
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                renames.append((entry.name, '_' + entry.name))
+            elif entry.name.startswith(' '):
+                renames.append((entry.name, entry.name.lstrip()))
+    for filename, new_filename in renames:
+        old_path = os.path.join(folder_path, filename)
+        new_path = os.path.join(folder_path, new_filename)
+        try:
+            os.replace(old_path, new_path)
+        except Exception as e:
+            print(f">> Error renaming file {filename}: {e}")
+
+def _is_invalid_task(local_path, username):
+    """Check whether a queued sync task is missing its username or points at a filesystem root."""
+    return not local_path or not username or local_path == os.path.dirname(local_path)
 
 class SyncHandler:
     def __init__(self):
         self.sync_queue = Queue()
         self.sync_thread = None
+        self._drain_lock = threading.Lock()  # Serializes callers draining the queue in wait_for_syncs
+        self._shutdown = threading.Event()  # Tells the background worker to exit
+        self._paused = threading.Event()  # Keeps the background worker idle while wait_for_syncs takes over
+        self._remote_prefix_cache = {}  # Remote user folder path keyed by username
         self.gdrive_base_path = "gdrive:/TikTok Archives"
+        # Transfer/checker counts honor rclone's own environment variables so they can be tuned per machine
         self.rclone_modifiers = [
-            "--transfers=20",
+            f"--transfers={os.getenv('RCLONE_TRANSFERS', '32')}",
+            f"--checkers={os.getenv('RCLONE_CHECKERS', '32')}",
+            "--fast-list",
             "--drive-chunk-size=256M",
+            "--drive-use-trash=false",
             "--exclude=.DS_Store",
             "-P"
         ]
@@ -22,13 +62,15 @@ class SyncHandler:
     def start_sync_thread(self):
         """Start the background sync thread if not already running"""
         if self.sync_thread is None:
+            self._shutdown.clear()
             self.sync_thread = threading.Thread(target=self._background_sync_worker, daemon=True)
             self.sync_thread.start()
 
     def stop_sync_thread(self):
-        """Stop the background sync thread"""
+        """Stop the background sync thread once it has finished the queued syncs"""
         if self.sync_thread is not None:
-            self.sync_queue.put(None)  # Poison pill
+            self.sync_queue.join()
+            self._shutdown.set()
             self.sync_thread.join()
             self.sync_thread = None
 
@@ -36,6 +78,15 @@ class SyncHandler:
         """Queue a folder for syncing"""
         self.sync_queue.put((local_path, username))
 
+    def _remote_prefix(self, username):
+        """Get the remote folder path for a username, building it once per user"""
+        prefix = self._remote_prefix_cache.get(username)
+        if prefix is None:
+            # Paths are passed to rclone as argv entries, so no escaping is needed
+            prefix = f"{self.gdrive_base_path}/{username}"
+            self._remote_prefix_cache[username] = prefix
+        return prefix
+
     def wait_for_syncs(self, show_progress=True):
         """
         Wait for all queued sync operations to complete
@@ -45,53 +96,127 @@ class SyncHandler:
         """
         # Store current queue size
         remaining = self.sync_queue.qsize()
-        if remaining > 0:
-            print(f"\n>> Waiting for {remaining} sync operations to complete...")
+        if remaining == 0:
+            return
+        
+        if remaining == 1:
+            # Sync a single task in place without pausing the background worker
+            print("\n>> Waiting for 1 sync operation to complete...")
+            with self._drain_lock:
+                try:
+                    task = self.sync_queue.get_nowait()
+                except Empty:
+                    pass  # The background worker already picked it up
+                else:
+                    try:
+                        self._sync_and_delete_folder(*task, show_progress=show_progress)
+                    except Exception as e:
+                        print(f">> Error syncing {os.path.basename(task[0])}: {str(e)}")
+                    finally:
+                        self.sync_queue.task_done()
             
-            # Create a list to track tasks that need to be requeued
+            # Wait for anything the background worker is still processing
+            self.sync_queue.join()
+            return
+        
+        print(f"\n>> Waiting for {remaining} sync operations to complete...")
+        with self._drain_lock:
+            # Pause the background worker and take over the queued tasks
+            self._paused.set()
             tasks = []
-            while not self.sync_queue.empty():
-                task = self.sync_queue.get()
-                if task is not None:  # Don't store the poison pill
-                    tasks.append(task)
+            while True:
+                try:
+                    tasks.append(self.sync_queue.get_nowait())
+                except Empty:
+                    break
                 self.sync_queue.task_done()
+        
+        # Group folders by username and parent directory so each group is copied by a single
+        # rclone process, with every folder landing directly under the user's remote folder
+        folders_by_batch = {}
+        for local_path, username in tasks:
+            if _is_invalid_task(local_path, username):
+                print(f">> Skipping invalid path: {local_path}")
+                continue
+            folders_by_batch.setdefault((username, os.path.dirname(local_path)), []).append(local_path)
+        
+        # Live progress output would interleave, so only show it when a single batch runs
+        show_batch_progress = show_progress and len(folders_by_batch) == 1
+        
+        def _sync_one(batch):
+            (username, parent_path), folder_paths = batch
+            remote_path = self._remote_prefix(username)
             
-            # Stop existing thread
-            self.stop_sync_thread()
-            
-            # Process tasks with progress
-            for task in tasks:
-                local_path, username = task
-                folder_name = os.path.basename(local_path)
-                remote_path = f"{self.gdrive_base_path}/{username}/{folder_name}"
-                
-                try:
-                    # Run sync with progress output
-                    self._run_rclone_sync(local_path, remote_path, folder_name, show_progress=True)
-                    # Delete the folder after successful sync
+            try:
+                synced_paths = self._run_rclone_batch_sync(parent_path, remote_path, folder_paths,
+                                                           show_progress=show_batch_progress)
+                # Delete the folders after successful sync
+                for local_path in synced_paths:
                     if os.path.exists(local_path):
-                        import shutil
                         shutil.rmtree(local_path)
-                        print(f">> Deleted local folder: {folder_name}")
-                except Exception as e:
-                    print(f">> Error syncing {folder_name}: {str(e)}")
-            
-            # Restart the sync thread for any future tasks
-            self.start_sync_thread()
+                        print(f">> Deleted local folder: {os.path.basename(local_path)}")
+            except Exception as e:
+                print(f">> Error syncing folders for {username}: {str(e)}")
+        
+        try:
+            # Run batches concurrently so Drive-side latency of each rclone process overlaps
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SYNCS) as executor:
+                list(executor.map(_sync_one, folders_by_batch.items()))
+        finally:
+            # Let the background worker resume for any future tasks
+            self._paused.clear()
+
+        # Wait for any task the background worker was already processing or that was queued
+        # during the batch; the worker must be un-paused first or those tasks never finish
+        self.sync_queue.join()
 
     def _background_sync_worker(self):
         """
         Worker thread that processes sync requests from the queue.
-        Runs continuously until receiving None as poison pill.
+        Runs continuously until the shutdown event is set, idling while paused.
         """
-        while True:
-            task = self.sync_queue.get()
-            if task is None:  # Poison pill to stop the thread
-                break
+        while not self._shutdown.is_set():
+            if self._paused.is_set():
+                time.sleep(0.05)
+                continue
+            
+            try:
+                task = self.sync_queue.get(timeout=0.5)
+            except Empty:
+                continue
                 
             local_path, username = task
-            self._sync_and_delete_folder(local_path, username)
-            self.sync_queue.task_done()
+            try:
+                self._sync_and_delete_folder(local_path, username)
+            except Exception as e:
+                print(f">> Error syncing {os.path.basename(local_path)}: {str(e)}")
+            finally:
+                self.sync_queue.task_done()
+
+    def _run_rclone(self, cmd, show_progress=False):
+        """
+        Run an rclone command, showing live output or streaming it into a bounded buffer.
+        
+        Args:
+            cmd: rclone command as an argv list
+            show_progress: Whether to show live progress output
+            
+        Raises:
+            subprocess.CalledProcessError: If rclone exits with an error, with the
+                last lines of its output as stderr
+        """
+        if show_progress:
+            subprocess.run(cmd, check=True)
+            return
+        
+        # Keep only the tail of the output so memory stays bounded on long transfers
+        output_tail = deque(maxlen=RCLONE_OUTPUT_TAIL_LINES)
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1) as process:
+            for line in process.stdout:
+                output_tail.append(line)
+        
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr="".join(output_tail))
 
     def _run_rclone_sync(self, local_path, remote_path, folder_name=None, show_progress=False):
         """
@@ -116,29 +241,21 @@ class SyncHandler:
             raise RuntimeError(error_msg)
             
         # Skip empty folders
-        if not os.listdir(local_path):
+        if _is_empty(local_path):
             print(f">> Skipping empty folder: {folder_name}")
             return True
             
-        # Escape paths with special characters
-        escaped_local_path = shlex.quote(local_path)
-        escaped_remote_path = shlex.quote(remote_path)
-        
+        # Pass argv directly so paths with special characters need no shell escaping
         cmd = [
             "rclone",
             "copy",
-            escaped_local_path,
-            escaped_remote_path,
-        ] + self.rclone_modifiers
+            local_path,
+            remote_path,
+            *self.rclone_modifiers
+        ]
         
         try:
-            cmd_str = " ".join(cmd)
-            if show_progress:
-                # Show live output
-                result = subprocess.run(cmd_str, shell=True, check=True)
-            else:
-                # Capture output during normal processing
-                result = subprocess.run(cmd_str, shell=True, capture_output=True, text=True, check=True)
+            self._run_rclone(cmd, show_progress=show_progress)
             
             print(f">> Successfully copied: {folder_name}")
             return True
@@ -154,19 +271,81 @@ class SyncHandler:
             print(f">> Error: {error_msg}")
             raise RuntimeError(error_msg) from e
 
-    def _sync_and_delete_folder(self, local_path, username):
+    def _run_rclone_batch_sync(self, parent_path, remote_path, folder_paths, show_progress=False):
+        """
+        Copy several folders with a single rclone invocation using --files-from-raw.
+        
+        Args:
+            parent_path: Local directory containing all of the folders
+            remote_path: Remote Google Drive path corresponding to parent_path
+            folder_paths: Paths of the local folders to copy
+            show_progress: Whether to show live progress output
+            
+        Returns:
+            list: Folder paths that were copied (or were empty) and can be deleted locally
+            
+        Raises:
+            RuntimeError: If rclone errors occur
+        """
+        # List every file relative to the parent so rclone can schedule them across one transfer pool
+        relative_files = []
+        synced_paths = []
+        for folder_path in folder_paths:
+            if not os.path.exists(folder_path):
+                print(f">> Skipping non-existent folder: {os.path.basename(folder_path)}")
+                continue
+            # Match the single-folder sync's renames so remote names don't depend on batching
+            _rename_hidden_files(folder_path)
+            for root, _, files in os.walk(folder_path):
+                for filename in files:
+                    if filename != ".DS_Store":
+                        relative_files.append(os.path.relpath(os.path.join(root, filename), parent_path))
+            synced_paths.append(folder_path)
+        
+        # Skip rclone entirely if all folders are empty
+        if not relative_files:
+            print(">> Skipping empty folders")
+            return synced_paths
+        
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as files_from:
+            files_from.write("\n".join(relative_files) + "\n")
+        
+        cmd = [
+            "rclone",
+            "copy",
+            parent_path,
+            remote_path,
+            f"--files-from-raw={files_from.name}",
+            *self.rclone_modifiers
+        ]
+        
+        try:
+            self._run_rclone(cmd, show_progress=show_progress)
+            print(f">> Successfully copied {len(synced_paths)} folders")
+            return synced_paths
+        except subprocess.CalledProcessError as e:
+            error_msg = f"rclone error copying {len(synced_paths)} folders"
+            if not show_progress and e.stderr:
+                error_msg += f": {e.stderr}"
+            print(f">> Error: {error_msg}")
+            raise RuntimeError(error_msg) from e
+        finally:
+            os.remove(files_from.name)
+
+    def _sync_and_delete_folder(self, local_path, username, show_progress=False):
         """
         Sync folder to Google Drive and delete local copy if successful.
         
         Args:
             local_path: Path to local folder to sync
             username: Username for remote path construction
+            show_progress: Whether to show live progress output
             
         Returns:
             bool: True if sync and delete were successful, False otherwise
         """
         # Skip if path components are invalid
-        if not local_path or not username or local_path == os.path.dirname(local_path):
+        if _is_invalid_task(local_path, username):
             print(f">> Skipping invalid path: {local_path}")
             return True
             
@@ -176,13 +355,12 @@ class SyncHandler:
             return True
             
         folder_name = os.path.basename(local_path)
-        remote_path = f"{self.gdrive_base_path}/{username}/{folder_name}"
+        remote_path = f"{self._remote_prefix(username)}/{folder_name}"
         
         # Skip empty folders
-        if not os.listdir(local_path):
+        if _is_empty(local_path):
             print(f">> Skipping empty folder: {folder_name}")
             try:
-                import shutil
                 shutil.rmtree(local_path)
                 print(f">> Deleted empty local folder: {folder_name}")
                 return True
@@ -191,27 +369,11 @@ class SyncHandler:
                 return False
         
         # Add check and rename for files starting with period or space
-        was_renamed = False  # Initialize the variable
-        for filename in os.listdir(local_path):
-            was_renamed = False  # Reset for each file
-            if filename.startswith('.'):
-                new_filename = '_' + filename
-                was_renamed = True
-            elif filename.startswith(' '):
-                new_filename = filename.lstrip()
-                was_renamed = True
-            if was_renamed:
-                old_path = os.path.join(local_path, filename)
-                new_path = os.path.join(local_path, new_filename)
-                try:
-                    os.rename(old_path, new_path)
-                except Exception as e:
-                    print(f">> Error renaming file {filename}: {e}")
+        _rename_hidden_files(local_path)
         
         print(f">> Starting sync of {folder_name}...")
-        if self._run_rclone_sync(local_path, remote_path, folder_name):
+        if self._run_rclone_sync(local_path, remote_path, folder_name, show_progress=show_progress):
             try:
-                import shutil
                 shutil.rmtree(local_path)
                 print(f">> Deleted local folder: {folder_name}")
                 return True
@@ -240,7 +402,7 @@ class SyncHandler:
             yt_dlp_handler.shutdown()
 
         username = os.path.basename(input_path)
-        remote_path = f"{self.gdrive_base_path}/{username}"
+        remote_path = self._remote_prefix(username)
 
         # Track if we have any queued tasks
         has_queued_tasks = False
@@ -261,26 +423,22 @@ class SyncHandler:
             self.wait_for_syncs(show_progress=True)
         
         # Sync text files and logs using copy to preserve remote folders
-        escaped_input_path = shlex.quote(input_path)
-        escaped_remote_path = shlex.quote(remote_path)
-        
         cmd = [
             "rclone", "copy",  # Using copy instead of sync to preserve remote folders
-            escaped_input_path,
-            escaped_remote_path,
-            "--filter", '"+ */"',  # Include all folders
-            "--filter", '"+ *.txt"',  # Only sync text files and logs
-            "--filter", '"+ *.log"',
-            "--filter", '"- geckodriver.log"',  # Exclude geckodriver.log specifically
-            "--filter", '"- .DS_Store"',  # Exclude .DS_Store files
-            "-v"
-        ] + self.rclone_modifiers
-        
-        cmd_str = " ".join(cmd)
+            input_path,
+            remote_path,
+            "--filter", "+ */",  # Include all folders
+            "--filter", "+ *.txt",  # Only sync text files and logs
+            "--filter", "+ *.log",
+            "--filter", "- geckodriver.log",  # Exclude geckodriver.log specifically
+            "--filter", "- .DS_Store",  # Exclude .DS_Store files
+            "-v",
+            *self.rclone_modifiers
+        ]
 
         try:
             # Always show progress for final sync
-            process = subprocess.run(cmd_str, shell=True, check=True, timeout=300)  # 5 minute timeout
+            process = subprocess.run(cmd, check=True, timeout=300)  # 5 minute timeout
             print(">> Successfully synced remaining files to Google Drive")
         except subprocess.TimeoutExpired:
             print(">> Error: Final sync timed out after 5 minutes")
@@ -4,11 +4,24 @@ import requests
 import re
 import time
 import os
-from typing import Dict, List, Optional
-from urllib.parse import urlparse
+import json
+import random
+import shelve
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlparse, urlencode
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 import os
 
+try:
+    import orjson  # Optional, parses API pages considerably faster than stdlib json
+except ImportError:
+    orjson = None
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -34,7 +47,8 @@ DEFAULT_HEADERS = {
     'authority': 'www.tiktok.com',
     'accept': '*/*',
     'accept-language': 'en-US,en;q=0.9',
-    'accept-encoding': 'gzip, deflate, br, zstd',
+    # Only advertise encodings urllib3 can decode here (br needs the brotli package)
+    'accept-encoding': ACCEPT_ENCODING,
     'dnt': '1',
     'pragma': 'no-cache',
     'cache-control': 'no-cache',
@@ -81,14 +95,73 @@ BASE_PARAMS = {
 }
 
 # Add rate limit constants
-MAX_RETRIES = 5
+MAX_RETRIES = 5  # Retries per request, for both HTTP errors and body-reported rate limits
 INITIAL_BACKOFF = 5  # Initial backoff time in seconds
 MAX_BACKOFF = 60    # Maximum backoff time in seconds
 
+MAX_CONCURRENT_COLLECTIONS = 8  # Maximum number of collections fetched at once
+COLLECTION_PAGE_SIZE = 30  # Items per collection page, matches the 'count' request param
+COLLECTION_PREFETCH_PAGES = 4  # Collection pages requested ahead of the one being processed
+
+DIRECTORY_CACHE_TTL = 3600  # Seconds a saved directory.log is reused instead of refetching collections
+USER_INFO_CACHE_TTL = 7 * 24 * 3600  # Seconds a cached user page ETag is revalidated against before a full fetch
+
+# On-disk cache of user page ETags and the user info parsed from them
+USER_INFO_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'tiktok-downloader', 'user_info.shelf')
+
+# Shared read-only stand-in for missing nested objects in API items; never mutate
+_EMPTY = {}
+
+# Precompiled patterns used when parsing URLs and pages
+_COLLECTION_ID_RE = re.compile(r'collection/[^-]+-(\d+)')
+_SECUID_RE = re.compile(rb'"secUid":"([^"]+)"')
+_USERID_RE = re.compile(rb'"id":"(\d+)"')
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'[<>:"/\\|?*]')
+_DIRECTORY_LINE_RE = re.compile(r'^[ \t]*\[(\d+)\][ \t]+(.+?)[ \t\r]*$', re.M)
+
+# Embedded page state containing the user detail JSON
+_REHYDRATION_DATA_RE = re.compile(rb'<script id="__UNIVERSAL_DATA_FOR_REHYDRATION__"[^>]*>(.*?)</script>', re.S)
+
+def _parse_json(response: requests.Response):
+    """Parse a JSON response body, using orjson on the raw bytes when available."""
+    if orjson is not None:
+        try:
+            return orjson.loads(response.content)
+        except ValueError:
+            # Let requests raise its own error so RequestException handlers still catch bad bodies
+            pass
+    return response.json()
+
+# Shared session created once so every crawl reuses pooled keep-alive connections.
+# Transport errors and 429/5xx responses are retried by urllib3 with exponential
+# backoff, honouring any Retry-After header the server sends. requests speaks HTTP/1.1
+# only, so concurrent page fetches each hold their own pooled connection; the pool is
+# sized for the most requests the collection fetchers keep in flight.
+_session = None
+def get_session() -> requests.Session:
+    """Get the shared requests session, creating it on first use."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=MAX_CONCURRENT_COLLECTIONS * COLLECTION_PREFETCH_PAGES,
+            max_retries=Retry(
+                total=MAX_RETRIES,
+                backoff_factor=1,
+                status_forcelist=[429, 500, 502, 503, 504],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        _session.mount('https://', adapter)
+    return _session
+
 def extract_collection_id(url: str) -> Optional[str]:
     """Extract collection ID from TikTok collection URL."""
     # Try direct regex match first
-    match = re.search(r'collection/[^-]+-(\d+)', url)
+    match = _COLLECTION_ID_RE.search(url)
     if match:
         return match.group(1)
     
@@ -103,30 +176,94 @@ def extract_collection_id(url: str) -> Optional[str]:
     
     return None
 
+def _extract_user_from_page(content: bytes) -> Optional[Dict]:
+    """Extract secUid and userId from the page's embedded rehydration JSON, if present."""
+    match = _REHYDRATION_DATA_RE.search(content)
+    if not match:
+        return None
+    
+    try:
+        data = json.loads(match.group(1))
+        user = data['__DEFAULT_SCOPE__']['webapp.user-detail']['userInfo']['user']
+    except (ValueError, KeyError, TypeError):
+        return None
+    
+    if user.get('secUid') and user.get('id'):
+        return {
+            'secUid': user['secUid'],
+            'userId': user['id']
+        }
+    return None
+
+def _load_cached_user_info(username: str) -> Optional[tuple]:
+    """Get the cached (etag, secUid, userId, timestamp) entry for a user, if any and not expired."""
+    try:
+        with shelve.open(USER_INFO_CACHE_PATH, flag='r') as cache:
+            cached = cache.get(username)
+    except Exception:
+        # Missing or unreadable cache just means a full fetch
+        return None
+    if cached and time.time() - cached[3] < USER_INFO_CACHE_TTL:
+        return cached
+    return None
+
+def _store_cached_user_info(username: str, etag: str, user_info: Dict) -> None:
+    """Remember the user page ETag and the user info parsed from it, dropping expired entries."""
+    try:
+        os.makedirs(os.path.dirname(USER_INFO_CACHE_PATH), exist_ok=True)
+        now = time.time()
+        with shelve.open(USER_INFO_CACHE_PATH) as cache:
+            for expired in [key for key, entry in cache.items() if now - entry[3] >= USER_INFO_CACHE_TTL]:
+                del cache[expired]
+            cache[username] = (etag, user_info['secUid'], user_info['userId'], now)
+    except Exception as e:
+        print(f"Warning: Could not update user info cache: {e}")
+
 def get_user_info(username: str, session: Optional[requests.Session] = None) -> Dict:
     """Get user info including secUid."""
     if session is None:
-        session = requests.Session()
+        session = get_session()
+    
+    # Revalidate against the last seen page so an unchanged page costs no body transfer
+    cached = _load_cached_user_info(username)
+    headers = DEFAULT_HEADERS
+    if cached:
+        headers = {**DEFAULT_HEADERS, 'if-none-match': cached[0]}
     
     try:
         # First get the user's page to extract secUid
         response = session.get(
             f'https://www.tiktok.com/@{username}',
-            headers=DEFAULT_HEADERS,
+            headers=headers,
             allow_redirects=True
         )
+        if response.status_code == 304 and cached:
+            return {
+                'secUid': cached[1],
+                'userId': cached[2]
+            }
         response.raise_for_status()
         
-        # Look for secUid in the page content
-        content = response.text
-        sec_uid_match = re.search(r'"secUid":"([^"]+)"', content)
-        user_id_match = re.search(r'"id":"(\d+)"', content)
+        # Read secUid from the embedded page state first, which avoids scanning the whole page
+        user_info = _extract_user_from_page(response.content)
+        if not user_info:
+            # Fall back to looking for secUid anywhere in the page bytes, skipping the str decode
+            content = response.content
+            sec_uid_match = _SECUID_RE.search(content)
+            user_id_match = _USERID_RE.search(content)
+            
+            if sec_uid_match and user_id_match:
+                # Only the captured ids are decoded; both are plain ASCII
+                user_info = {
+                    'secUid': sec_uid_match.group(1).decode('ascii'),
+                    'userId': user_id_match.group(1).decode('ascii')
+                }
         
-        if sec_uid_match and user_id_match:
-            return {
-                'secUid': sec_uid_match.group(1),
-                'userId': user_id_match.group(1)
-            }
+        if user_info:
+            etag = response.headers.get('ETag')
+            if etag:
+                _store_cached_user_info(username, etag, user_info)
+            return user_info
         
         print("Could not find secUid in page content, trying API...")
         
@@ -146,7 +283,7 @@ def get_user_info(username: str, session: Optional[requests.Session] = None) ->
         )
         api_response.raise_for_status()
         
-        data = api_response.json()
+        data = _parse_json(api_response)
         user = data.get('userInfo', {}).get('user', {})
         
         if user:
@@ -163,162 +300,308 @@ def get_user_info(username: str, session: Optional[requests.Session] = None) ->
             print(f"Response content: {e.response.content}")
         raise
 
+# Static request parameters, built once and copied per page
+_COLLECTION_LIST_PARAMS = {
+    **BASE_PARAMS,
+    'WebIdLastTime': '1736604666',
+    'device_id': '7458660215698966062',
+    'odinId': '7458660231299171374',
+    'count': '30',
+    'coverFormat': '2',
+    'cursor': '0',
+    'secUid': '',
+    'needPinnedItemIds': 'true',
+    'publicOnly': 'true',
+    'post_item_list_request_type': '0'
+}
+
+_COLLECTION_PARAMS = {
+    **BASE_PARAMS,
+    'WebIdLastTime': '1736602635',
+    'clientABVersions': '70508271,72923695,73038832,73067877,73167671,73184710,73216053,73234258,73240211,73242625,73242628,73242629,73262085,73273316,73289689,70405643,71057832,71200802,72267504,72361743,73171280,73208420',
+    'collectionId': '',
+    'count': '30',
+    'cursor': '0',
+    'data_collection_enabled': 'false',
+    'device_id': '7458651491272918570',
+    'odinId': '7458651507845121067'
+}
+
+# Constant part of the collection items URL, encoded once; only collectionId and cursor vary per page
+_COLLECTION_ITEMS_URL_PREFIX = ENDPOINTS['collection_items'] + '?' + urlencode(
+    {key: value for key, value in _COLLECTION_PARAMS.items() if key not in ('collectionId', 'cursor')}
+)
+
 def get_collection_list_params(username: str, sec_uid: str, cursor: int = 0) -> Dict:
     """Get parameters for collection list request."""
-    return {
-        **BASE_PARAMS,
-        'WebIdLastTime': '1736604666',
-        'device_id': '7458660215698966062',
-        'odinId': '7458660231299171374',
-        'count': '30',
-        'coverFormat': '2',
-        'cursor': str(cursor),
-        'secUid': sec_uid,
-        'needPinnedItemIds': 'true',
-        'publicOnly': 'true',
-        'post_item_list_request_type': '0'
-    }
+    return _COLLECTION_LIST_PARAMS | {'cursor': cursor, 'secUid': sec_uid}
 
 def get_collection_params(collection_id: str, cursor: str = "0") -> Dict:
     """Get parameters for collection items request."""
-    return {
-        **BASE_PARAMS,
-        'WebIdLastTime': '1736602635',
-        'clientABVersions': '70508271,72923695,73038832,73067877,73167671,73184710,73216053,73234258,73240211,73242625,73242628,73242629,73262085,73273316,73289689,70405643,71057832,71200802,72267504,72361743,73171280,73208420',
-        'collectionId': collection_id,
-        'count': '30',
-        'cursor': cursor,
-        'data_collection_enabled': 'false',
-        'device_id': '7458651491272918570',
-        'odinId': '7458651507845121067'
-    }
+    return _COLLECTION_PARAMS | {'collectionId': collection_id, 'cursor': cursor}
 
 def format_video_url(video_id: str) -> str:
     """Format a video ID into a TikTok URL."""
     return f'https://www.tiktok.com/@/video/{video_id}'
 
-def fetch_collection_items(collection_id: str, session: Optional[requests.Session] = None, cursor: str = "0", existing_count: int = 0, delay: float = 0) -> List[str]:
+def _fetch_collection_page(session: requests.Session, collection_id: str, cursor: int) -> Dict:
+    """Fetch and parse a single page of a collection."""
+    response = session.get(
+        f"{_COLLECTION_ITEMS_URL_PREFIX}&{urlencode({'collectionId': collection_id, 'cursor': cursor})}",
+        headers=DEFAULT_HEADERS
+    )
+    response.raise_for_status()
+    return _parse_json(response)
+
+def fetch_collection_items(collection_id: str, session: Optional[requests.Session] = None, cursor: str = "0", existing_count: int = 0, delay: float = 0, prefetch: int = COLLECTION_PREFETCH_PAGES, known_ids: Optional[Set[str]] = None) -> List[str]:
     """
     Fetch all video IDs from a TikTok collection using their web API.
     
+    Cursors normally advance by one page size, so once the first page confirms that,
+    up to `prefetch` pages are requested ahead using the predicted cursors. If the server
+    returns a different cursor, the speculative requests are discarded, fetching continues
+    from the real cursor and no further pages are requested ahead.
+    
     Args:
         collection_id: ID of the TikTok collection
         session: Optional requests.Session to use for requests
         cursor: Optional cursor to start fetching from
         existing_count: Number of existing items when resuming from a cursor
-        delay: Optional delay between requests in seconds (default: 0)
+        delay: Optional delay between requests in seconds (default: 0, disables prefetching when set)
+        prefetch: Maximum number of pages requested at once
+        known_ids: Optional video IDs already collected (e.g. when resuming), left out of the result
         
     Returns:
-        List of video IDs from the collection
+        List of new, unique video IDs from the collection
     """
     if session is None:
-        session = requests.Session()
+        session = get_session()
     
     has_more = True
     video_ids = []
+    # IDs already returned or known, so overlapping pages don't produce duplicates
+    seen_ids = set(known_ids) if known_ids else set()
+    # Cursors are offsets; keep them as ints and only stringify when encoding the request
+    cursor = int(cursor)
     # Calculate starting page number based on cursor (assuming increments of 30)
-    page = (int(cursor) // 30) + 1
+    page = (cursor // 30) + 1
+    
+    # Pages requested at once; a delay asks for paced requests, so fetch one at a time.
+    # Start with a single page and only widen the window once the cursor stride is confirmed.
+    max_window = 1 if delay > 0 else max(1, prefetch)
+    window = 1
+    speculate = max_window > 1  # Cleared for good after the first misprediction
+    pending = deque()  # (cursor, future) pairs in page order
+    next_request_cursor = cursor
 
     print(f"Fetching collection {collection_id} starting from cursor {cursor}...")
     
-    while has_more:
-        params = get_collection_params(collection_id, cursor)
-        
+    with ThreadPoolExecutor(max_workers=max_window) as executor:
         try:
-            # Add delay if specified
-            if delay > 0 and len(video_ids) > 0:  # Don't delay on first request
-                import time
-                time.sleep(delay)
-            
-            response = session.get(
-                ENDPOINTS['collection_items'],
-                params=params,
-                headers=DEFAULT_HEADERS
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract items from response
-            items = data.get("itemList", [])
-            if not items:
-                print("No more items found")
-                break
-            # Process items
-            for item in items:
-                video_id = item.get("video", {}).get("id")
-                if video_id:
-                    video_ids.append(video_id)
-            
-            # Get next cursor before printing progress
-            next_cursor = str(data.get("cursor", "0"))
-            print(f"Page {page}: {len(items):,} found, total collected: {len(video_ids) + existing_count:,} [next cursor: {next_cursor}]")
-            
-            # Check if there are more items and update cursor
-            has_more = data.get("hasMore", False)
-            cursor = next_cursor
-            page += 1
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching data on page {page}: {e}")
-            if hasattr(e, 'response'):
-                print(f"Response text: {e.response.text}")
-            break
+            while has_more:
+                # Keep the window of in-flight page requests full
+                while len(pending) < window:
+                    # Add delay if specified
+                    if delay > 0 and len(video_ids) > 0:  # Don't delay on first request
+                        time.sleep(delay)
+                    future = executor.submit(_fetch_collection_page, session, collection_id, next_request_cursor)
+                    pending.append((next_request_cursor, future))
+                    # Predict the following page's cursor
+                    next_request_cursor += COLLECTION_PAGE_SIZE
+                
+                cursor, future = pending.popleft()
+                try:
+                    data = future.result()
+                except requests.exceptions.RequestException as e:
+                    print(f"Error fetching data on page {page}: {e}")
+                    if getattr(e, 'response', None) is not None:
+                        print(f"Response text: {e.response.text}")
+                    break
+                
+                # Extract items from response
+                items = data.get("itemList", [])
+                if not items:
+                    print("No more items found")
+                    break
+                # Process items, touching only the video id of each entry
+                for item in items:
+                    video_id = (item.get("video") or _EMPTY).get("id")
+                    if video_id and video_id not in seen_ids:
+                        seen_ids.add(video_id)
+                        video_ids.append(video_id)
+                
+                # Get next cursor before printing progress
+                next_cursor = int(data.get("cursor", 0))
+                print(f"Page {page}: {len(items):,} found, total collected: {len(video_ids) + existing_count:,} [next cursor: {next_cursor}]")
+                
+                # Check if there are more items and update cursor
+                has_more = data.get("hasMore", False)
+                page += 1
+                
+                # Re-anchor on the server's cursor if the prediction was wrong, and stop
+                # guessing since the stride can't be trusted; otherwise start prefetching
+                expected_cursor = pending[0][0] if pending else next_request_cursor
+                if has_more and next_cursor != expected_cursor:
+                    for _, stale in pending:
+                        stale.cancel()
+                    pending.clear()
+                    next_request_cursor = next_cursor
+                    speculate = False
+                    window = 1
+                elif speculate:
+                    window = max_window
+        finally:
+            # Drop speculative requests past the end of the collection
+            for _, stale in pending:
+                stale.cancel()
     
     print(f"\nTotal videos found: {len(video_ids) + existing_count:,}")
     return video_ids
 
+def fetch_all_collection_items(collection_ids: List[str], delay: float = 0, max_workers: int = MAX_CONCURRENT_COLLECTIONS, session: Optional[requests.Session] = None) -> Iterator[Tuple[str, Optional[List[str]]]]:
+    """
+    Fetch video IDs for several collections concurrently.
+    
+    Separate collections are fetched in parallel over the shared session's connection
+    pool, on top of the page prefetching done within each collection. A delay asks for
+    paced requests, so collections are then fetched one at a time.
+    
+    Args:
+        collection_ids: IDs of the TikTok collections to fetch
+        delay: Optional delay between requests in seconds (default: 0, disables concurrency when set)
+        max_workers: Maximum number of collections fetched at once
+        session: Optional requests.Session to share across all workers
+        
+    Yields:
+        (collection_id, video_ids) for each collection in the given order, as soon as it and
+        every collection before it have finished; video_ids is None if the fetch failed
+    """
+    # Fetch each collection once, even if it's listed more than once
+    unique_ids = list(dict.fromkeys(collection_ids))
+    if not unique_ids:
+        return
+    
+    if session is None:
+        session = get_session()
+    workers = 1 if delay > 0 else min(max(1, max_workers), len(unique_ids))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            collection_id: executor.submit(fetch_collection_items, collection_id, session, delay=delay)
+            for collection_id in unique_ids
+        }
+        results = {}
+        for collection_id in collection_ids:
+            if collection_id not in results:
+                try:
+                    results[collection_id] = futures[collection_id].result()
+                except Exception as e:
+                    # One failed collection shouldn't lose the others
+                    print(f"Error fetching collection {collection_id}: {e}")
+                    results[collection_id] = None
+            yield collection_id, results[collection_id]
+
 def sanitize_filename(name: str) -> str:
     """Sanitize a string to be used as a filename."""
-    return re.sub(r'[<>:"/\\|?*]', '_', name)
+    # Most names are already safe; return them as-is without building a new string
+    if not _UNSAFE_FILENAME_CHARS_RE.search(name):
+        return name
+    return _UNSAFE_FILENAME_CHARS_RE.sub('_', name)
 
-def save_collections_directory(collections: List[Dict], output_path: str = "directory.log"):
-    """Save collections list to a directory file."""
+class Collection:
+    """
+    A TikTok collection record.
+    
+    Uses __slots__ to keep large collection lists compact. Item access
+    (collection['id'], collection.get('total')) is kept so code written against
+    the old dict records keeps working.
+    """
+    __slots__ = ('id', 'name', 'total')
+    
+    def __init__(self, id: str, name: str, total: int = 0):
+        self.id = id
+        self.name = name
+        self.total = total
+    
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+    
+    def __repr__(self) -> str:
+        return f"Collection(id={self.id!r}, name={self.name!r}, total={self.total!r})"
+
+def _directory_totals_path(directory_path: str) -> str:
+    """Get the sidecar file holding collection totals for a directory file."""
+    return os.path.splitext(directory_path)[0] + '.totals.json'
+
+def save_collections_directory(collections: List[Collection], output_path: str = "directory.log"):
+    """Save collections list to a directory file, with their totals in a sidecar file."""
     try:
         with open(output_path, 'w', encoding='utf-8') as f:
-            for collection in collections:
-                f.write(f"[{collection['id']}] {collection['name']}\n")
+            f.write(''.join(f"[{collection.id}] {collection.name}\n" for collection in collections))
+        with open(_directory_totals_path(output_path), 'w', encoding='utf-8') as f:
+            json.dump({collection.id: collection.total for collection in collections}, f)
         print(f"\nSaved {len(collections)} collections to {output_path}")
     except Exception as e:
         print(f"Error saving directory: {e}")
 
-def read_collections_directory(directory_path: str) -> List[Dict]:
+def read_collections_directory(directory_path: str) -> List[Collection]:
     """Read collections from a directory file."""
+    # Totals aren't part of directory.log; older directories have no sidecar and read as 0
+    totals = {}
+    try:
+        with open(_directory_totals_path(directory_path), 'r', encoding='utf-8') as f:
+            totals = json.load(f)
+    except (OSError, ValueError):
+        pass
+    
     collections = []
     try:
         with open(directory_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                # Parse [id] name format
-                if match := re.match(r'\[(\d+)\]\s+(.+)$', line.strip()):
-                    collection_id, name = match.groups()
-                    collections.append({
-                        'id': collection_id,
-                        'name': name,
-                        'total': 0  # We don't have this info from the file
-                    })
+            content = f.read()
+        # Parse [id] name format across the whole file in one pass
+        for match in _DIRECTORY_LINE_RE.finditer(content):
+            collection_id, name = match.groups()
+            collections.append(Collection(collection_id, name, totals.get(collection_id, 0)))
         print(f"\nLoaded {len(collections)} collections from {directory_path}")
         return collections
     except Exception as e:
         print(f"Error reading directory: {e}")
         raise
 
-def fetch_collections(username: str, delay: float = 0, directory_path: Optional[str] = None, save_to: Optional[str] = None) -> List[Dict]:
+def fetch_collections(username: str, delay: float = 0, directory_path: Optional[str] = None, save_to: Optional[str] = None, force_refresh: bool = False) -> List[Collection]:
     """
     Fetch all collections for a TikTok user with retry logic.
     
+    HTTP errors are retried by the shared session; rate limits reported in the
+    response body are retried here with exponential backoff.
+    
     Args:
         username: TikTok username to fetch collections for
         delay: Optional delay between requests in seconds (default: 0)
         directory_path: Optional path to read collections from instead of fetching
         save_to: Optional path to save directory.log to (default: directory.log in current dir)
+        force_refresh: Fetch from the API even if the directory.log at save_to is recent
         
     Returns:
-        List of collection dictionaries containing id and name
+        List of Collection records with id, name and total
     """
     # If directory path is provided, read from it instead of fetching
     if directory_path and os.path.exists(directory_path):
         return read_collections_directory(directory_path)
     
-    session = requests.Session()
+    # Reuse the directory saved by a recent run instead of refetching every page. Only an
+    # explicit save_to is trusted, since the default directory.log isn't tied to a user.
+    if save_to and not force_refresh and os.path.exists(save_to):
+        age = time.time() - os.path.getmtime(save_to)
+        if age < DIRECTORY_CACHE_TTL:
+            print(f"\nUsing {save_to} saved {int(age // 60)} minutes ago")
+            return read_collections_directory(save_to)
+    
+    session = get_session()
     
     try:
         # Get user info first
@@ -346,18 +629,18 @@ def fetch_collections(username: str, delay: float = 0, directory_path: Optional[
                 )
                 response.raise_for_status()
                 
-                data = response.json()
+                data = _parse_json(response)
                 
-                # Check for rate limit or error response
-                if data.get('statusCode') == 10101 or response.status_code == 500:
+                # Check for a rate limit reported in the response body, which HTTP-level retries can't see
+                if data.get('statusCode') == 10101:
                     if retry_count >= MAX_RETRIES:
                         raise Exception(f"Max retries ({MAX_RETRIES}) exceeded. Last error: {data.get('statusMsg', 'Rate limited')}")
                     
-                    print(f"\nRate limited, waiting {current_backoff} seconds before retry {retry_count + 1}/{MAX_RETRIES}...")
+                    print(f"\nRate limited, waiting {current_backoff:.1f} seconds before retry {retry_count + 1}/{MAX_RETRIES}...")
                     time.sleep(current_backoff)
                     
-                    # Exponential backoff with jitter
-                    current_backoff = min(current_backoff * 2 + (time.time() % 1), MAX_BACKOFF)
+                    # Decorrelated exponential backoff, so parallel runs don't retry in lockstep
+                    current_backoff = min(random.uniform(INITIAL_BACKOFF, current_backoff * 3), MAX_BACKOFF)
                     retry_count += 1
                     continue
                 
@@ -368,13 +651,10 @@ def fetch_collections(username: str, delay: float = 0, directory_path: Optional[
                 items = data.get('collectionList', [])
                 
                 for item in items:
-                    collection = {
-                        'id': item.get('collectionId'),
-                        'name': sanitize_filename(item.get('name', '')),
-                        'total': int(item.get('total', '0'))
-                    }
-                    if collection['id'] and collection['name']:
-                        collections.append(collection)
+                    collection_id = item.get('collectionId')
+                    name = sanitize_filename(item.get('name', ''))
+                    if collection_id and name:
+                        collections.append(Collection(collection_id, name, int(item.get('total', '0'))))
                 
                 print(f"Page {page}: {len(items)} collections found, total collected: {len(collections):,}")
                 
@@ -382,21 +662,12 @@ def fetch_collections(username: str, delay: float = 0, directory_path: Optional[
                 cursor = int(data.get('cursor', '0'))  # Convert cursor to int
                 page += 1
                 
-            except requests.exceptions.RequestException as e:
-                if retry_count >= MAX_RETRIES:
-                    print(f"\nFailed after {MAX_RETRIES} retries")
-                    raise
-                
-                print(f"\nRequest error, waiting {current_backoff} seconds before retry {retry_count + 1}/{MAX_RETRIES}...")
-                if hasattr(e, 'response'):
-                    print(f"Response content: {e.response.content}")
-                
+            except requests.exceptions.RequestException:
+                # Retryable statuses were already retried by the session, but 4xx errors and
+                # non-HTTP failures weren't, so don't claim a retry count here
+                print(f"\nRequest failed on page {page}")
                 print("\n| PLEASE NOTE\n| Ensure the user's account is public and the desired collections are all public\n")
-                
-                time.sleep(current_backoff)
-                current_backoff = min(current_backoff * 2 + (time.time() % 1), MAX_BACKOFF)
-                retry_count += 1
-                continue
+                raise
         
         # Save collections to directory file after successful fetch
         if save_to:
@@ -407,7 +678,7 @@ def fetch_collections(username: str, delay: float = 0, directory_path: Optional[
         
     except Exception as e:
         print(f"Error fetching collections: {e}")
-        if hasattr(e, 'response'):
+        if getattr(e, 'response', None) is not None:
             print(f"Response content: {e.response.content}")
         raise
 
@@ -467,7 +738,7 @@ def fetch_user_reposts(sec_uid: str, session: Optional[requests.Session] = None,
         List of video IDs from the user's reposts
     """
     if session is None:
-        session = requests.Session()
+        session = get_session()
     
     has_more = True
     video_ids = []
@@ -490,7 +761,7 @@ def fetch_user_reposts(sec_uid: str, session: Optional[requests.Session] = None,
                 headers=DEFAULT_HEADERS
             )
             response.raise_for_status()
-            data = response.json()
+            data = _parse_json(response)
             
             # Extract items from response
             items = data.get("itemList", [])
@@ -498,11 +769,8 @@ def fetch_user_reposts(sec_uid: str, session: Optional[requests.Session] = None,
                 print("No more items found")
                 break
                 
-            # Process items
-            for item in items:
-                video_id = item.get("id")
-                if video_id:
-                    video_ids.append(video_id)
+            # Process items, touching only the id of each entry
+            video_ids.extend(item["id"] for item in items if item.get("id"))
             
             # Update cursor and has_more
             cursor = str(data.get("cursor", "0"))
@@ -2,14 +2,38 @@
 
 import os
 import re
+import json
+import unicodedata
+from functools import lru_cache
 from urllib.parse import urlparse
 import time
+import random
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 SPLIT_SIZE = 500  # Maximum number of URLs per split file
 FILE_SIZE_THRESHOLD_KB = 50 # Minimum file size in KB
+FILE_SIZE_THRESHOLD_BYTES = FILE_SIZE_THRESHOLD_KB * 1_000  # Minimum file size in bytes
 MAX_FILENAME_LENGTH = 70
+VIDEO_ID_CACHE_SIZE = 131072  # URLs whose extracted video IDs are memoized
+MAX_FILE_READ_WORKERS = 16  # Maximum number of URL/log files read at once
+PATH_CACHE_SIZE = 1024  # Paths whose derived username/output folder are memoized
+MAX_RETRY_WAIT = 300  # Maximum seconds to wait before retrying a rate-limited batch
+
+# Characters deleted from filenames by clean_filename: control characters, DEL and
+# reserved path characters. '-' is included because the previous '\x00-\x1f' spec was
+# matched character by character rather than as a range.
+_FILENAME_DELETE_TABLE = dict.fromkeys([*range(32), 0x7f, *map(ord, '<>:"/\\|?*-')])
+
+# Precompiled pattern for the numeric ID in video and photo URLs
+_VIDEO_ID_RE = re.compile(r'/(?:video|photo)/(\d+)')
+
+# Retry-After hint, in seconds, carried in a rate-limit error message
+_RETRY_AFTER_RE = re.compile(r'Retry-After[:\s]+(\d+)', re.IGNORECASE)
+
+# Suffix of uncategorized group file names, e.g. "<all saves name> (Group 3).txt"
+_GROUP_FILE_RE = re.compile(r' \(Group (\d+)\)\.txt')
 
 
 def clean_filename(name):
@@ -22,28 +46,23 @@ def clean_filename(name):
     Returns:
         str: Cleaned filename safe for use in filesystem
     """
-    # First, replace any invalid Unicode characters and control characters
-    name = ''.join(char for char in name if ord(char) < 65536 and ord(char) >= 32 and char != '\ufff6')
-    name = name.encode('ascii', 'ignore').decode('ascii')
+    # Nothing to clean in an empty or whitespace-only name
+    if not name or name.isspace():
+        return ""
     
-    # Remove other invalid filename characters
-    invalid_chars = '<>:"/\\|?*\x00-\x1f\x7f'
-    name = ''.join(char for char in name if char not in invalid_chars)
+    # Decompose accented letters so they keep their ASCII base letter ("é" -> "e"), then drop
+    # the remaining non-ASCII characters and control, newline and invalid filename characters
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    name = name.translate(_FILENAME_DELETE_TABLE)
     
-    # Replace empty result with empty string
+    # Names made only of dropped characters still come out empty
     if not name.strip():
-        name = ""
-        return name
+        return ""
     
     # Remove leading periods
-    while name.startswith('.'):
-        name = name[1:]
-    
-    # Remove newline characters
-    name = name.replace('\n', '').replace('\r', '')
-    
-    return name
+    return name.lstrip('.')
 
+@lru_cache(maxsize=VIDEO_ID_CACHE_SIZE)
 def extract_video_id(url):
     """
     Extract video ID from TikTok URL, handling both video and photo formats.
@@ -54,14 +73,23 @@ def extract_video_id(url):
     Returns:
         str: Video/photo ID if found, None otherwise
     """
-    # Remove any leading @ symbol first
-    url = url.lstrip('@')
-    match = re.search(r'/video/(\d+)|/photo/(\d+)', url)
-    if match:
-        # Return first matching group (video ID) or second matching group (photo ID)
-        return match.group(1) if match.group(1) else match.group(2)
-    return None
+    # A leading @ can't affect the match, which is anchored on the /video/ or /photo/ segment
+    match = _VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None
 
+def extract_video_ids(text):
+    """
+    Extract every video/photo ID from a block of text, such as the contents of a URL list file.
+    
+    Args:
+        text: Text containing any number of TikTok URLs
+        
+    Returns:
+        list: Video/photo IDs in the order they appear, including repeats
+    """
+    return _VIDEO_ID_RE.findall(text)
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
 def get_username_from_path(path):
     """Extract username from path by getting the parent directory name"""
     return os.path.basename(os.path.dirname(path))
@@ -79,6 +107,31 @@ def get_filename_suffix(url):
     video_id = extract_video_id(url)
     return f" {video_id}" if video_id else "" 
 
+def _get_group_number(filename, all_saves_name):
+    """Get N from an "<all_saves_name> (Group N).txt" filename, or None for other files."""
+    if filename.startswith(all_saves_name):
+        match = _GROUP_FILE_RE.fullmatch(filename, len(all_saves_name))
+        if match:
+            return int(match.group(1))
+    return None
+
+def _read_urls(path):
+    """Read the non-empty, stripped lines of a URL list file."""
+    with open(path, 'r') as f:
+        return [url for url in map(str.strip, f.read().splitlines()) if url]
+
+def _read_video_ids(path):
+    """Read the set of video IDs in a file, scanning its contents directly."""
+    with open(path, 'r') as f:
+        return set(extract_video_ids(f.read()))
+
+def _map_files(func, paths):
+    """Apply func to each path on a thread pool, returning the results in order."""
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_FILE_READ_WORKERS, len(paths))) as executor:
+        return list(executor.map(func, paths))
+
 def get_highest_group_number(input_path, all_saves_name):
     """
     Find the highest existing group number in the directory.
@@ -91,13 +144,11 @@ def get_highest_group_number(input_path, all_saves_name):
         int: Highest group number found
     """
     highest_group = 0
-    for file in os.listdir(input_path):
-        if file.startswith(f"{all_saves_name} (Group ") and file.endswith(").txt"):
-            try:
-                group_num = int(file.split("Group ")[1].split(")")[0])
+    with os.scandir(input_path) as it:
+        for entry in it:
+            group_num = _get_group_number(entry.name, all_saves_name)
+            if group_num is not None:
                 highest_group = max(highest_group, group_num)
-            except (ValueError, IndexError):
-                continue
     return highest_group
 
 def write_and_process_urls(output_file, urls_to_add, file_handler, selenium_handler, 
@@ -124,16 +175,21 @@ def write_and_process_urls(output_file, urls_to_add, file_handler, selenium_hand
     existing_urls = []
     if os.path.exists(output_file):
         with open(output_file, "r") as f:
-            existing_urls = [url.strip() for url in f.readlines() if url.strip()]
+            existing_urls = [url for url in map(str.strip, f.read().splitlines()) if url]
     
-    # Only add URLs that don't exist in file
-    urls_to_write = [url for url in urls_to_add 
-                    if not any(extract_video_id(url) == extract_video_id(existing_url)
-                             for existing_url in existing_urls)]
+    # Only add URLs whose video ID isn't already in the file or earlier in this batch
+    seen_ids = {extract_video_id(url) for url in existing_urls}
+    urls_to_write = []
+    for url in urls_to_add:
+        video_id = extract_video_id(url)
+        if video_id not in seen_ids:
+            seen_ids.add(video_id)
+            urls_to_write.append(url)
     
     if urls_to_write:
-        with open(output_file, "w") as f:
-            f.write("\n".join(existing_urls + urls_to_write))
+        existing_urls.extend(urls_to_write)
+        with open(output_file, "wb") as f:
+            f.write("\n".join(existing_urls).encode('utf-8'))
         
         # Add retry logic with exponential backoff
         max_retries = 3
@@ -157,8 +213,15 @@ def write_and_process_urls(output_file, urls_to_add, file_handler, selenium_hand
             except Exception as e:
                 if "HTTP Error 429" in str(e) or "Too Many Requests" in str(e):
                     if attempt < max_retries - 1:
-                        wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
-                        print(f"\nRate limit detected. Waiting {wait_time} seconds before retry...")
+                        # Exponential backoff with jitter, so concurrent workers don't retry in lockstep
+                        base_delay = retry_delay * (2 ** attempt)
+                        wait_time = random.uniform(base_delay / 2, base_delay)
+                        # Wait at least as long as the server asked, if it said
+                        retry_after = _RETRY_AFTER_RE.search(str(e))
+                        if retry_after:
+                            wait_time = max(wait_time, int(retry_after.group(1)))
+                        wait_time = min(wait_time, MAX_RETRY_WAIT)
+                        print(f"\nRate limit detected. Waiting {wait_time:.0f} seconds before retry...")
                         time.sleep(wait_time)
                         continue
                 raise  # Re-raise the exception if we've exhausted retries
@@ -184,70 +247,61 @@ def split_into_groups(urls, input_path, file_handler, start_group, verbose=False
         print(f"\nAnalyzing existing groups and URLs...")
         print(f"Total URLs to process: {len(urls):,}")
     
-    group_files = []
-    existing_urls = set()
-    existing_video_ids = set()  # New set to store extracted video IDs
+    group_files = set()
+    existing_video_ids = set()  # Video IDs already in group files
+    existing_group_nums = set()
     
-    # First, collect URLs from existing group files and map them to their groups
-    group_to_urls = {}
+    # First, collect video IDs and group numbers from existing group files
     if verbose:
         print("Scanning for existing group files...")
     
+    # Sort the directory into source collection files and group files in a single scan
+    source_paths = []
+    group_entries = []
+    with os.scandir(input_path) as it:
+        for entry in it:
+            name = entry.name
+            group_num = _get_group_number(name, file_handler.all_saves_name)
+            if group_num is not None:
+                group_entries.append((group_num, entry.path))
+            elif (name.endswith(".txt")
+                  and not name.startswith(file_handler.error_prefix)
+                  and not name.startswith(file_handler.all_saves_name)
+                  and name != "Favorite Videos (URLs).txt"):
+                source_paths.append(entry.path)
+    
     # First check source files for duplicates
     if verbose:
         print("Checking source files for duplicates...")
     source_video_ids = set()
-    text_files = [f for f in os.listdir(input_path) 
-                 if f.endswith(".txt") 
-                 and not f.startswith(file_handler.error_prefix)
-                 and not f.startswith(file_handler.all_saves_name)
-                 and f != "Favorite Videos (URLs).txt"]
-    
-    for source_file in text_files:
-        source_path = os.path.join(input_path, source_file)
-        with open(source_path, 'r') as f:
-            source_links = [url.strip() for url in f.readlines() if url.strip()]
-            source_video_ids.update(extract_video_id(url) for url in source_links)
+    # Only the IDs are needed, so scan each file's contents directly instead of line by line
+    for video_ids in _map_files(_read_video_ids, source_paths):
+        source_video_ids.update(video_ids)
     
     if verbose:
         print(f"Found {len(source_video_ids):,} existing video IDs in source files")
     
-    # Now check existing group files
-    for file in os.listdir(input_path):
-        if file.startswith(f"{file_handler.all_saves_name} (Group ") and file.endswith(").txt"):
-            file_path = os.path.join(input_path, file)
-            try:
-                group_num = int(file.split("Group ")[1].split(")")[0])
-                group_to_urls[group_num] = set()
-                with open(file_path, 'r') as f:
-                    file_urls = [url.strip() for url in f.readlines() if url.strip()]
-                    group_to_urls[group_num].update(file_urls)
-                    existing_urls.update(file_urls)
-                    # Extract and store video IDs
-                    existing_video_ids.update(
-                        vid for url in file_urls 
-                        if (vid := extract_video_id(url)) is not None
-                    )
-                group_files.append(file_path)
-            except (ValueError, IndexError):
-                if verbose:
-                    print(f"Skipping invalid group file: {file}")
-                continue
+    # Now check existing group files; only their IDs are needed, so scan them like the source files
+    group_ids_by_file = _map_files(_read_video_ids, [file_path for _, file_path in group_entries])
+    for (group_num, file_path), file_video_ids in zip(group_entries, group_ids_by_file):
+        existing_group_nums.add(group_num)
+        existing_video_ids.update(file_video_ids)
+        group_files.add(file_path)
     
     if verbose:
         print(f"Found {len(group_files):,} existing group files")
-        print(f"Found {len(existing_urls):,} existing URLs")
+        print(f"Found {len(existing_video_ids):,} existing video IDs in group files")
     
     # Find URLs that aren't in any existing group or source file
     if verbose:
         print("Checking for new URLs...")
+    # Check against both group files and source files, and earlier URLs in this list
+    seen_ids = existing_video_ids | source_video_ids
     new_urls = []
-    
     for url in urls:
         video_id = extract_video_id(url)
-        # Check against both group files and source files
-        is_new = video_id not in existing_video_ids and video_id not in source_video_ids
-        if is_new:
+        if video_id not in seen_ids:
+            seen_ids.add(video_id)
             new_urls.append(url)
     if verbose:
         print(f"Found {len(new_urls):,} new URLs to process")
@@ -258,14 +312,10 @@ def split_into_groups(urls, input_path, file_handler, start_group, verbose=False
         return sorted(group_files)
     
     # Find the highest existing group number and any gaps in numbering
-    highest_group = 0
-    expected_groups = set()
-    if group_to_urls:
-        highest_group = max(group_to_urls.keys())
-        expected_groups = set(range(1, highest_group + 1))
-        missing_groups = expected_groups - set(group_to_urls.keys())
-        if missing_groups and verbose:
-            print(f"Found gaps in group numbering: missing groups {sorted(missing_groups)}")
+    highest_group = max(existing_group_nums, default=0)
+    missing_groups = set(range(1, highest_group + 1)) - existing_group_nums
+    if missing_groups and verbose:
+        print(f"Found gaps in group numbering: missing groups {sorted(missing_groups)}")
     
     # Calculate how many groups we need for new URLs
     total_groups_needed = (len(new_urls) + SPLIT_SIZE - 1) // SPLIT_SIZE
@@ -273,8 +323,7 @@ def split_into_groups(urls, input_path, file_handler, start_group, verbose=False
         print(f"Need {total_groups_needed:,} groups for new URLs (max {SPLIT_SIZE} URLs per group)")
     
     # If we have missing groups, use those numbers first
-    if group_to_urls:
-        missing_groups = expected_groups - set(group_to_urls.keys())
+    if existing_group_nums:
         available_group_nums = sorted(missing_groups) + list(range(highest_group + 1, highest_group + total_groups_needed + 1))
         if verbose:
             print(f"Will use group numbers: {available_group_nums}")
@@ -291,18 +340,17 @@ def split_into_groups(urls, input_path, file_handler, start_group, verbose=False
         group_urls = new_urls[i:i + SPLIT_SIZE]
         group_file = os.path.join(input_path, f"{file_handler.all_saves_name} (Group {group_num}).txt")
         
-        # Write URLs to group file
-        with open(group_file, "w") as f:
-            f.write("\n".join(group_urls))
+        # Write URLs to group file, encoding once and bypassing the text I/O layer
+        with open(group_file, "wb") as f:
+            f.write("\n".join(group_urls).encode('utf-8'))
         
-        if group_file not in group_files:
-            group_files.append(group_file)
+        group_files.add(group_file)
     
     if verbose:
         print(f"Finished creating {len(group_files):,} total group files")
     return sorted(group_files)  # Return all files (existing + new) in sorted order
 
-def remove_duplicates_from_groups(source_file, directory, dry_run=False):
+def remove_duplicates_from_groups(source_file, directory, dry_run=False, verbose=False, source_video_ids=None):
     """
     Remove links from uncategorized group files if they exist in the source file.
     
@@ -310,22 +358,26 @@ def remove_duplicates_from_groups(source_file, directory, dry_run=False):
         source_file (str): Path to the source file containing links
         directory (str): Directory containing the group files to check
         dry_run (bool): If True, only simulate the changes without writing to files
+        verbose (bool): If True, print the ID of every removed link
+        source_video_ids (set): Video IDs already read from source_file; read from the file if None
     
     Returns:
         int: Number of links removed from group files
     """
-    # Read source file links
-    with open(source_file, 'r') as f:
-        source_links = set(url.strip() for url in f.readlines() if url.strip())
-        source_video_ids = set(extract_video_id(url) for url in source_links)
+    # Read source file video IDs unless the caller already has them
+    if source_video_ids is None:
+        source_video_ids = _read_video_ids(source_file)
 
     # Print which file we're processing
     print(f"\nProcessing source file: {os.path.basename(source_file)}")
-    print(f"Found {len(source_links):,} links in source file")
+    print(f"Found {len(source_video_ids):,} video IDs in source file")
     
     # Find all group files
-    group_files = [f for f in os.listdir(directory) 
-                  if f.endswith('.txt') and ' (Group ' in f and not f.startswith('[error')]
+    with os.scandir(directory) as it:
+        # Cheapest test first: most entries in a user directory are downloaded videos, not .txt files
+        group_files = [entry.name for entry in it
+                       if entry.name.endswith('.txt') and not entry.name.startswith('[error')
+                       and _GROUP_FILE_RE.search(entry.name) and entry.is_file()]
     
     if not group_files:
         print("No group files found.")
@@ -334,34 +386,33 @@ def remove_duplicates_from_groups(source_file, directory, dry_run=False):
     print(f"Processing {len(group_files):,} group files...")
     total_removed = 0
     
-    for group_file in group_files:
-        group_path = os.path.join(directory, group_file)
-        with open(group_path, 'r') as f:
-            group_links = [url.strip() for url in f.readlines() if url.strip()]
+    # Read all group files up front on a thread pool, then filter them in order
+    group_paths = [os.path.join(directory, group_file) for group_file in group_files]
+    for group_file, group_path, group_links in zip(group_files, group_paths, _map_files(_read_urls, group_paths)):
         
-        # Filter out links that exist in source file
+        # Filter out links that exist in source file, remembering the removed IDs
         filtered_links = []
-        removed_count = 0
+        removed_ids = []
         
         for link in group_links:
             video_id = extract_video_id(link)
             if video_id not in source_video_ids:
                 filtered_links.append(link)
             else:
-                removed_count += 1
+                removed_ids.append(video_id)
         
+        removed_count = len(removed_ids)
         if removed_count > 0:
             print(f"Removing {removed_count:,} duplicates from {group_file}")
-            print("Removed IDs:")
-            for link in group_links:
-                video_id = extract_video_id(link)
-                if video_id in source_video_ids:
+            if verbose:
+                print("Removed IDs:")
+                for video_id in removed_ids:
                     print(f"\t{video_id}")
             
             if not dry_run:
                 # Write the filtered links back to the group file
-                with open(group_path, 'w', encoding='utf-8') as f:
-                    f.write('\n'.join(filtered_links))
+                with open(group_path, 'wb') as f:
+                    f.write('\n'.join(filtered_links).encode('utf-8'))
             total_removed += removed_count
             
             action = "Would remove" if dry_run else "Removed"
@@ -370,19 +421,24 @@ def remove_duplicates_from_groups(source_file, directory, dry_run=False):
     print(f"Total links removed: {total_removed}")
     return total_removed
 
+def _count_error_log(error_file):
+    """Count the (private, failed) entries in an error log."""
+    if not os.path.exists(error_file):
+        return 0, 0
+    # Each entry is a URL, optionally followed by " (private)", so splitting the whole
+    # file on whitespace lets both counts be taken in C instead of per line
+    with open(error_file, 'rb') as f:
+        tokens = f.read().split()
+    private_count = tokens.count(b"(private)")
+    return private_count, len(tokens) - 2 * private_count
+
 def print_final_summary(input_path, file_handler):
     """Print final summary statistics after processing is complete"""
     # Count successfully downloaded videos (deduped by video ID)
     success_count = 0
-    unique_video_ids = set()
     if os.path.exists(file_handler.success_log_path):
-        with open(file_handler.success_log_path, 'r') as f:
-            for line in f:
-                if line.strip():
-                    video_id = extract_video_id(line.strip())
-                    if video_id:
-                        unique_video_ids.add(video_id)
-            success_count = len(unique_video_ids)
+        # Only the number of distinct IDs is needed, so scan the whole log in one pass
+        success_count = len(_read_video_ids(file_handler.success_log_path))
     
     # Count failed and private videos from error logs
     total_private = 0
@@ -395,20 +451,13 @@ def print_final_summary(input_path, file_handler):
         if os.path.exists(error_file):
             error_files.append(error_file)
     else:
-        for file in os.listdir(input_path):
-            if file.startswith(file_handler.error_prefix):
-                error_files.append(os.path.join(input_path, file))
+        with os.scandir(input_path) as it:
+            error_files.extend(entry.path for entry in it if entry.name.startswith(file_handler.error_prefix))
     
-    # Process each error log
-    for error_file in error_files:
-        if os.path.exists(error_file):
-            with open(error_file, 'r') as f:
-                for line in f:
-                    if line.strip():
-                        if line.strip().endswith(" (private)"):
-                            total_private += 1
-                        else:
-                            total_failed += 1
+    # Process each error log, reading them on a thread pool
+    for private_count, failed_count in _map_files(_count_error_log, error_files):
+        total_private += private_count
+        total_failed += failed_count
     
     # Get total size of remote directory for this user
     total_size = 0
@@ -416,12 +465,18 @@ def print_final_summary(input_path, file_handler):
                               else os.path.dirname(input_path))
     remote_path = f"gdrive:/TikTok Archives/{username}"
     
+    # Both rclone calls are network-bound round trips to Drive, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        link_future = executor.submit(subprocess.run, ['rclone', 'link', remote_path],
+                                      capture_output=True, text=True)
+        size_future = executor.submit(subprocess.run, ['rclone', 'size', '--json', remote_path],
+                                      capture_output=True, text=True)
+    
     # Generate shareable link for Google Drive
     drive_link = ""
     try:
-        # Run rclone link command to get a shareable link
-        result = subprocess.run(['rclone', 'link', remote_path], 
-                              capture_output=True, text=True)
+        # Get the shareable link from the rclone link command
+        result = link_future.result()
         
         if result.returncode == 0:
             drive_link = result.stdout.strip()
@@ -432,17 +487,12 @@ def print_final_summary(input_path, file_handler):
     
     # Get size information
     try:
-        result = subprocess.run(['rclone', 'size', remote_path], 
-                              capture_output=True, text=True)
+        result = size_future.result()
         
         if result.returncode == 0:
-            # Extract total size from output and convert to GB
-            size_lines = [line for line in result.stdout.split('\n') 
-                         if 'Total size:' in line]
-            if size_lines:
-                # Extract bytes value and convert to GB
-                bytes_str = size_lines[0].split('(')[1].split()[0]
-                bytes_val = float(bytes_str)
+            # Read the total size in bytes from the JSON output and convert to GB
+            bytes_val = json.loads(result.stdout).get('bytes')
+            if bytes_val is not None:
                 gb_val = round(bytes_val / (1024**3))  # Convert bytes to GB and round
                 total_size = f"{gb_val}GB"
             else:
@@ -508,10 +558,14 @@ def split_urls_by_type(urls):
     Returns:
         tuple: (video_urls, photo_urls) where each is a set of URLs
     """
-    photo_urls = {url for url in urls if "/photo/" in url}
-    video_urls = {url for url in urls if url not in photo_urls}
+    video_urls = set()
+    photo_urls = set()
+    # Single pass, so urls may also be a one-shot iterator
+    for url in urls:
+        (photo_urls if "/photo/" in url else video_urls).add(url)
     return video_urls, photo_urls
 
+@lru_cache(maxsize=PATH_CACHE_SIZE)
 def get_output_folder(file_path):
     """
     Get the output folder path for a given input file.
@@ -542,13 +596,23 @@ def get_error_file_path(output_folder):
     collection_name = os.path.basename(output_folder)
     return os.path.join(os.path.dirname(output_folder), f"[error log] {collection_name}.txt")
     
+# (epoch second, formatted time) of the most recent log line, replaced as a whole
+_log_timestamp = (None, '')
+
 def log_worker(worker_type, worker_num, message):
     """Log a message for a worker."""
-    print(f"{time.strftime('%I:%M:%S')} [{worker_type}-{'0' if worker_num < 10 else ''}{worker_num}] {message}")
+    global _log_timestamp
+    # Only format the time once per second, since workers can log many lines per second
+    now = int(time.time())
+    second, timestamp = _log_timestamp
+    if second != now:
+        timestamp = time.strftime('%I:%M:%S', time.localtime(now))
+        _log_timestamp = (now, timestamp)
+    print(f"{timestamp} [{worker_type}-{'0' if worker_num < 10 else ''}{worker_num}] {message}")
 
 def is_file_size_valid(file_size_in_bytes):
     """Check if a file is valid based on its size."""
-    return file_size_in_bytes / 1_000 > FILE_SIZE_THRESHOLD_KB
+    return file_size_in_bytes > FILE_SIZE_THRESHOLD_BYTES
 
 def filter_links_against_collections(links, collection_paths):
     """
@@ -567,10 +631,9 @@ def filter_links_against_collections(links, collection_paths):
         try:
             with open(collection_path, 'r') as f:
                 for line in f:
-                    if line.strip():
-                        video_id = extract_video_id(line.strip())
-                        if video_id:
-                            collection_video_ids.add(video_id)
+                    video_id = extract_video_id(line)
+                    if video_id:
+                        collection_video_ids.add(video_id)
         except Exception as e:
             print(f"Error reading {collection_path}: {str(e)}", file=sys.stderr)
             continue
@@ -1,22 +1,138 @@
 """Download validation functionality."""
 
 import os
+import json
+import sqlite3
 import subprocess
-from .utils import extract_video_id, is_file_size_valid, MAX_FILENAME_LENGTH
+import tempfile
+import time
+import zlib
+from collections import Counter
+from contextlib import closing
+from concurrent.futures import Future, ThreadPoolExecutor
+from .utils import extract_video_id, extract_video_ids, is_file_size_valid, MAX_FILENAME_LENGTH
 import re
 
+try:
+    import orjson  # Optional, parses rclone listings faster than stdlib json
+except ImportError:
+    orjson = None
+
 MAX_FILENAME_WITH_ID_AND_EXTENSION_LENGTH = MAX_FILENAME_LENGTH + 23
+VIDEO_EXTENSIONS = frozenset({'mp4', 'mov', 'avi', 'mkv', 'webm'})  # Lowercase, without the dot
+MAX_CONCURRENT_LISTINGS = 8  # Maximum number of rclone listings run at once
+REMOTE_LISTING_CACHE_TTL = 3600  # Seconds a cached remote listing is reused for
+
+# On-disk cache of remote folder listings, keyed by rclone path
+REMOTE_LISTING_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'tiktok-downloader', 'rclone-listings.sqlite')
+
+# Splits a filename into text and number runs for natural sorting
+_NUM_SPLIT_RE = re.compile(r'([0-9]+)')
+
+
+def _is_video_file(filename):
+    """Check whether a filename ends with one of the video extensions, ignoring case."""
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in VIDEO_EXTENSIONS
+
+def _get_file_id(filename):
+    """Get the ID from a "<name> <id>.<ext>" filename: its last word up to the first period."""
+    return filename.rpartition(' ')[2].partition('.')[0]
+
+def _get_collection_name(txt_file):
+    """Get the collection name from a text file name, handling multiple extensions."""
+    return txt_file.split('.txt')[0].rstrip('.')
+
+def _list_remote_folder(remote_path):
+    """
+    List a remote folder recursively with `rclone lsjson`, parsing entries as the output streams in.
+    
+    Args:
+        remote_path: rclone path of the folder to list
+        
+    Returns:
+        tuple: (int return code, list of (path, size) tuples, str stderr output)
+    """
+    cmd = ["rclone", "lsjson", remote_path, "--recursive", "--files-only",
+           "--no-modtime", "--no-mimetype", "--fast-list"]
+    remote_files = []
+    # stderr goes to a file so a chatty rclone can't fill its pipe while stdout is being read
+    with tempfile.TemporaryFile() as stderr_file:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True) as process:
+            try:
+                # lsjson writes one object per line between the opening and closing brackets
+                for line in process.stdout:
+                    line = line.rstrip().rstrip(',')
+                    if line.startswith('{'):
+                        remote_file = orjson.loads(line) if orjson is not None else json.loads(line)
+                        remote_files.append((remote_file['Path'], remote_file['Size']))
+            except Exception:
+                process.kill()
+                raise
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode('utf-8', 'replace')
+    return process.returncode, remote_files, stderr
+
+def _connect_listing_cache():
+    """Open a connection to the remote listing cache, creating it if needed."""
+    os.makedirs(os.path.dirname(REMOTE_LISTING_CACHE_PATH), exist_ok=True)
+    connection = sqlite3.connect(REMOTE_LISTING_CACHE_PATH)
+    connection.execute("CREATE TABLE IF NOT EXISTS listings (remote_path TEXT PRIMARY KEY, "
+                       "source_mtime REAL, fetched_at REAL, listing BLOB)")
+    return connection
+
+def _load_cached_listings(source_mtimes):
+    """
+    Get cached listings of remote folders that are recent and whose text files are unchanged.
+    
+    Args:
+        source_mtimes: Dict mapping each remote folder's rclone path to its text file's modification time
+        
+    Returns:
+        dict: {rclone path: list of (path, size) tuples} for folders with a usable cached listing
+    """
+    listings = {}
+    try:
+        with closing(_connect_listing_cache()) as cache:
+            for remote_path, source_mtime in source_mtimes.items():
+                row = cache.execute("SELECT source_mtime, fetched_at, listing FROM listings WHERE remote_path = ?",
+                                    (remote_path,)).fetchone()
+                if row is None or row[0] != source_mtime or time.time() - row[1] >= REMOTE_LISTING_CACHE_TTL:
+                    continue
+                listings[remote_path] = [tuple(remote_file) for remote_file in json.loads(zlib.decompress(row[2]))]
+    except Exception as e:
+        # An unreadable cache just means fresh listings
+        print(f"Warning: Could not read remote listing cache: {e}")
+    return listings
+
+def _store_cached_listing(remote_path, source_mtime, remote_files):
+    """Remember a successful remote folder listing along with its text file's modification time."""
+    try:
+        # closing() releases the connection; the connection's own context commits the write
+        with closing(_connect_listing_cache()) as cache, cache:
+            cache.execute("INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?)",
+                          (remote_path, source_mtime, time.time(),
+                           zlib.compress(json.dumps(remote_files).encode())))
+    except Exception as e:
+        print(f"Warning: Could not update remote listing cache: {e}")
 
 class Validator:
     def __init__(self, gdrive_base_path="gdrive:/TikTok Archives"):
         self.gdrive_base_path = gdrive_base_path
         self.error_prefix = "[error log] "
 
-    def validate_downloads(self, input_path):
+    def validate_downloads(self, input_path, refresh_remote=False):
         """
         Validates that all videos from text files are either downloaded as MP4s or listed in error logs.
         Also checks for sub-50kb files and files without extensions.
         
+        Remote listings from the last REMOTE_LISTING_CACHE_TTL seconds are reused for collections
+        whose text file hasn't changed since, unless refresh_remote is set.
+        
+        Args:
+            input_path: Directory containing the collection text files
+            refresh_remote: Whether to re-list every remote folder instead of using cached listings
+        
         Returns:
             dict: {
                 'missing': {collection_name: set(missing_ids)},
@@ -36,9 +152,6 @@ class Validator:
             'too_long': {}  # Files with filenames longer than MAX_FILENAME_LENGTH
         }
         
-        # Define video extensions at the start of the method
-        video_extensions = ('.mp4', '.mov', '.avi', '.mkv', '.webm')
-        
         if not os.path.isdir(input_path):
             print(f"Error: {input_path} is not a directory")
             return validation_results
@@ -46,11 +159,12 @@ class Validator:
         username = os.path.basename(input_path)
         
         # Get all text files (excluding error logs, .DS_Store, and all_saves_file)
-        text_files = [f for f in os.listdir(input_path) 
-                     if f.endswith(".txt") 
-                     and not f.startswith(self.error_prefix) 
-                     and f != ".DS_Store"
-                     and f != "Favorite Videos (URLs).txt"]
+        with os.scandir(input_path) as it:
+            text_files = [entry.name for entry in it
+                          if entry.name.endswith(".txt")
+                          and not entry.name.startswith(self.error_prefix)
+                          and entry.name != "Favorite Videos (URLs).txt"
+                          and entry.is_file()]
         
         # Sort files: regular collections first (alphabetically), then uncategorized by group number
         def sort_key(filename):
@@ -59,7 +173,7 @@ class Validator:
                 if " (Group " in filename:
                     try:
                         # Extract group number for uncategorized group files
-                        group_num = int(filename.split("Group ")[1].split(")")[0])
+                        group_num = int(filename.partition("Group ")[2].partition(")")[0])
                         return (1, group_num, '')  # 1 to put after regular collections
                     except (IndexError, ValueError):
                         return (1, float('inf'), filename.lower())  # Handle malformed filenames
@@ -67,7 +181,7 @@ class Validator:
             
             # Regular collection files (e.g., "Home.txt", "Korean food.txt", etc.)
             # Use alphanumeric sorting for regular collections
-            return (0, 0, [int(text) if text.isdigit() else text.lower() for text in re.split('([0-9]+)', filename)])
+            return (0, 0, [int(text) if text.isdigit() else text.lower() for text in _NUM_SPLIT_RE.split(filename)])
         
         text_files.sort(key=sort_key)
         
@@ -76,32 +190,55 @@ class Validator:
         success_log_entries = set()
         if os.path.exists(success_log_path):
             with open(success_log_path, 'r') as f:
-                success_log_entries = {line.strip() for line in f}
+                success_log_entries = {entry for entry in map(str.strip, f) if entry}
+        
+        # Index the success log's video IDs by collection prefix once, instead of rescanning
+        # it and re-extracting IDs per collection
+        success_ids_by_collection = {}
+        unprefixed_success_ids = set()
+        for entry in success_log_entries:
+            prefix, separator, url = entry.partition(':::')
+            if separator:
+                success_ids_by_collection.setdefault(prefix, set()).add(extract_video_id(url))
+            else:
+                unprefixed_success_ids.add(extract_video_id(entry))
+        
+        # Start every collection's remote listing up front so the network round trips overlap.
+        # Shutting down without waiting lets the queued listings keep running in the background.
+        # Collections with a recent cached listing and an unchanged text file skip rclone entirely.
+        remote_listings = {}
+        remote_paths = {txt_file: f"{self.gdrive_base_path}/{username}/{_get_collection_name(txt_file)}"
+                        for txt_file in text_files}
+        source_mtimes = {remote_paths[txt_file]: os.path.getmtime(os.path.join(input_path, txt_file))
+                         for txt_file in text_files}
+        cached_listings = {} if refresh_remote or not text_files else _load_cached_listings(source_mtimes)
+        if cached_listings:
+            print(f"Reusing {len(cached_listings):,} cached remote listings")
+        if text_files:
+            executor = ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_LISTINGS, len(text_files)))
+            for txt_file in text_files:
+                remote_path = remote_paths[txt_file]
+                if remote_path in cached_listings:
+                    remote_listings[txt_file] = Future()
+                    remote_listings[txt_file].set_result((0, cached_listings[remote_path], ''))
+                else:
+                    remote_listings[txt_file] = executor.submit(_list_remote_folder, remote_path)
+            executor.shutdown(wait=False)
         
         for txt_file in text_files:
-            # Get collection name from file name, handling multiple extensions
-            collection_name = txt_file.split('.txt')[0]
-            while collection_name.endswith('.'):
-                collection_name = collection_name[:-1]
+            collection_name = _get_collection_name(txt_file)
             collection_folder = os.path.join(input_path, collection_name)
             txt_path = os.path.join(input_path, txt_file)
             error_log_path = os.path.join(input_path, f"{self.error_prefix}{txt_file}")
-            remote_path = f"{self.gdrive_base_path}/{username}/{collection_name}"
-            
             print(f"\nValidating: {collection_name}")
             
             # Get video IDs from text file and check for duplicates
-            video_ids = []
+            # Scan the whole file in one regex pass; repeats are kept for the duplicate check
             with open(txt_path, 'r') as f:
-                for line in f:
-                    if line.strip():
-                        vid_id = extract_video_id(line.strip())
-                        if vid_id:
-                            video_ids.append(vid_id)
+                video_ids = extract_video_ids(f.read())
             
             # Check for duplicates
-            duplicate_ids = {vid_id: count for vid_id, count in zip(video_ids, map(video_ids.count, video_ids)) 
-                            if count > 1}
+            duplicate_ids = {vid_id: count for vid_id, count in Counter(video_ids).items() if count > 1}
             if duplicate_ids:
                 print(f"Duplicate video IDs found in {txt_file}:")
                 for vid_id, count in duplicate_ids.items():
@@ -117,32 +254,33 @@ class Validator:
             
             # Check local folder if it exists
             if os.path.exists(collection_folder):
-                local_files = [f for f in os.listdir(collection_folder) 
-                              if os.path.isfile(os.path.join(collection_folder, f))
-                              and f != ".DS_Store"]
+                # scandir entries carry their path and cached file type, so no per-file join or stat is needed
+                with os.scandir(collection_folder) as it:
+                    local_files = [entry for entry in it
+                                   if entry.name != ".DS_Store" and entry.is_file()]
                 
-                for filename in local_files:
-                    file_path = os.path.join(collection_folder, filename)
+                for entry in local_files:
+                    filename = entry.name
                     # Check for files without extensions
                     if '.' not in filename:
-                        invalid_files[filename] = file_path
+                        invalid_files[filename] = entry.path
                         continue
                         
                     # Check for video files with matching ID pattern
-                    if not filename.lower().endswith(video_extensions):
+                    if not _is_video_file(filename):
                         # Non-video files are considered extra
                         extra_ids[f"non_video_{len(extra_ids)}"] = f"(local) {filename}"
                         continue
                         
-                    file_id = filename.rsplit(' ', 1)[-1].split('.')[0]  # Remove any extension
-                    file_size = os.path.getsize(file_path)
+                    file_id = _get_file_id(filename)
                     
                     if not file_id.isdigit():
                         # Video files without valid IDs are considered extra
                         extra_ids[f"invalid_id_{len(extra_ids)}"] = f"(local) {filename}"
                         continue
                         
-                    if not is_file_size_valid(file_size):
+                    # Only stat files that passed the name checks; scandir caches the result on the entry
+                    if not is_file_size_valid(entry.stat().st_size):
                         empty_files[file_id] = f"(local) {filename}"
                         continue
                     
@@ -155,86 +293,30 @@ class Validator:
             
             # Check remote folder using rclone
             try:
-                # Use rclone ls to get file sizes
-                cmd = ["rclone", "ls", remote_path, "--fast-list"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                # Use the rclone lsjson listing started above to get file names and sizes
+                returncode, remote_files, stderr = remote_listings[txt_file].result()
                 
-                if result.returncode == 0:
-                    remote_files = result.stdout.splitlines()
-                    i = 0
-                    while i < len(remote_files):
-                        line = remote_files[i].strip()
-
-                        if not line:
-                            i += 1
+                if returncode == 0:
+                    remote_dir = f"{self.gdrive_base_path}/{username}/{collection_name}"
+                    if remote_dir not in cached_listings:
+                        _store_cached_listing(remote_dir, source_mtimes[remote_dir], remote_files)
+                    for filename, file_size in remote_files:  # Size is -1 when the remote doesn't know it
+                        filename = filename.strip()
+                        
+                        # Check for multi-line filenames
+                        if '\n' in filename or '\r' in filename:
+                            filename = " ".join(map(str.strip, filename.splitlines()))
+                            invalid_files[filename] = f"{remote_dir}/{filename}"
+                            print(f"invalid file: {filename} (contains newline)")
                             continue
-
-                        remote_dir = f"{self.gdrive_base_path}/{username}/{collection_name}"
-
-                        # Try to parse as normal "size filename" format first
-                        try:
-                            was_multiline = False
-                            parts = line.split(' ', 1)
-                            if len(parts) == 2:
-                                size_str, filename = parts
-                                try:
-                                    file_size = int(size_str)
-                                except ValueError:
-                                    # If first part isn't a number, treat the whole line as filename
-                                    filename = line
-                                    file_size = -1  # Assume non-zero size since file exists
-                                    was_multiline = True
-                            else:
-                                filename = line
-                                file_size = -1  # Assume non-zero size since file exists
-                                was_multiline = True
-                            
-                            # Check for files without video extensions
-                            if not filename.lower().endswith(video_extensions):
-                                # Look ahead at subsequent lines until we find a video extension
-                                next_i = i + 1
-                                while next_i < len(remote_files):
-                                    next_line = remote_files[next_i].strip()
-                                    # If next line starts with a number, it's a new file
-                                    if next_line and next_line.split(' ', 1)[0].isdigit():
-                                        break
-                                    filename += " " + next_line
-                                    was_multiline = True
-                                    if filename.lower().endswith(video_extensions):
-                                        i = next_i  # Update main index to skip the lines we consumed
-                                        break
-                                    next_i += 1
-
-                            # Strip leading/trailing spaces from filename
-                            filename = filename.strip()
-
-                            # Check for multi-line filenames
-                            if was_multiline:
-                                remote_path = f"{remote_dir}/{filename}"
-                                invalid_files[filename] = remote_path
-                                print(f"invalid file: {filename} (contains newline)")
-                                i += 1
-                                continue
-                            
-                            # If still no video extension, mark as invalid
-                            if not filename.lower().endswith(video_extensions):
-                                remote_path = f"{remote_dir}/{filename}"
-                                invalid_files[filename] = remote_path
-                                print(f"invalid file: {filename}")
-                                i += 1
-                                continue
-                            
-                        except ValueError:
-                            # If parsing fails, treat the whole line as filename
-                            filename = line
-                            file_size = -1  # Assume non-zero size since file exists
-
-                        if not filename.lower().endswith(video_extensions):
-                            # Non-video files are considered extra
-                            extra_ids[f"non_video_{len(extra_ids)}"] = f"(remote) {filename}"
+                        
+                        # Files without a video extension are invalid
+                        if not _is_video_file(filename):
+                            invalid_files[filename] = f"{remote_dir}/{filename}"
+                            print(f"invalid file: {filename}")
                             continue
                             
-                        file_id = filename.rsplit(' ', 1)[-1].split('.')[0]  # Remove any extension
+                        file_id = _get_file_id(filename)
                         
                         if not file_id.isdigit():
                             # Video files without valid IDs are considered extra 
@@ -251,32 +333,21 @@ class Validator:
                             
                         downloaded_ids.add(file_id)
                         downloaded_map[file_id] = f"(remote) {filename}"
-                        i += 1
                 else:
-                    print(f"Warning: Could not check remote folder: {result.stderr}")
+                    print(f"Warning: Could not check remote folder: {stderr}")
             except Exception as e:
                 print(f"Error checking remote folder: {e}")
             
             # Get error log IDs
             error_ids = set()
             if os.path.exists(error_log_path):
+                # The ID pattern stops at the digits, so " (private)" suffixes needn't be removed first
                 with open(error_log_path, 'r') as f:
-                    error_ids = {extract_video_id(url.strip().replace(' (private)', '')) 
-                               for url in f if url.strip()}
+                    error_ids = set(extract_video_ids(f.read()))
             
             # Check success log for this collection
-            # First try collection-prefixed entries
-            collection_prefix = f"{collection_name}:::"
-            collection_success_entries = {entry.split(':::', 1)[-1] for entry in success_log_entries 
-                                       if entry.startswith(collection_prefix)}
-            
-            # If no prefixed entries found, check for non-prefixed entries
-            if not collection_success_entries:
-                # Check for entries that don't have any collection prefix
-                collection_success_entries = {entry for entry in success_log_entries 
-                                           if ':::' not in entry}
-            
-            success_ids = {extract_video_id(url) for url in collection_success_entries}
+            # First try collection-prefixed entries, then fall back to entries without any prefix
+            success_ids = success_ids_by_collection.get(collection_name) or unprefixed_success_ids
             downloaded_ids.update(success_ids)
             
             # Find missing and extra IDs
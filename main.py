@@ -104,7 +104,7 @@ def main():
                         print(f"\nPre-processing {file_handler.all_saves_file}")
 
                     with open(all_saves_path, "r") as f:
-                        urls = [url.strip() for url in f.readlines() if url.strip()]
+                        urls = [url for url in map(str.strip, f) if url]
                     
                     if urls:
                         if not combine_uncategorized:
@@ -122,10 +122,12 @@ def main():
                                 print(f"Found {len(group_files):,} group files")
                 
                 # If it's a directory, process all text files in the directory
-                text_files = [f for f in os.listdir(input_path) 
-                            if f.endswith(".txt") 
-                            and not f.startswith(file_handler.error_prefix)
-                            and f != file_handler.all_saves_file]
+                with os.scandir(input_path) as it:
+                    text_files = [entry.name for entry in it
+                                  if entry.name.endswith(".txt")
+                                  and not entry.name.startswith(file_handler.error_prefix)
+                                  and entry.name != file_handler.all_saves_file
+                                  and entry.is_file()]
                 
                 # Sort files: regular collections first, then uncategorized groups
                 def sort_key(x):
@@ -135,7 +137,7 @@ def main():
                     # For all_saves files, extract and sort by group number if it exists
                     if is_all_saves and "Group " in x:
                         try:
-                            group_num = int(x.split("Group ")[1].split(")")[0])
+                            group_num = int(x.partition("Group ")[2].partition(")")[0])
                             return (1, group_num, '')  # 1 to put after regular collections
                         except (ValueError, IndexError):
                             pass
@@ -157,7 +159,7 @@ def main():
                         file_path = os.path.join(input_path, file_name)
                         # Collect URLs from each file
                         with open(file_path, "r") as f:
-                            processed_urls.update(url.strip() for url in f.readlines() if url.strip())
+                            processed_urls.update(url for url in map(str.strip, f) if url)
                         process_file(file_path, index, total_files,
                                   file_handler, selenium_handlers, 
                                   yt_dlp_handler, sync_handler,
@@ -170,7 +172,7 @@ def main():
                 if group_files:
                     print("\nProcessing uncategorized groups...")
                     for group_file in group_files:
-                        group_num = int(group_file.split("Group ")[1].split(")")[0])
+                        group_num = int(group_file.partition("Group ")[2].partition(")")[0])
                         process_file(group_file, group_num + regular_collection_end_index,
                                   total_files,
                                   file_handler, selenium_handlers,
@@ -290,8 +292,10 @@ def main():
     
     # Add validation step unless skipped
     if not skip_validation:
+        # Cached remote listings are stale once this run has synced new downloads
         validation_results = validator.validate_downloads(input_path if os.path.isdir(input_path) 
-                                  else os.path.dirname(input_path))
+                                  else os.path.dirname(input_path),
+                                  refresh_remote=not skip_sync)
         
         # Only print final summary if there are no issues
         if any(validation_results.values()):
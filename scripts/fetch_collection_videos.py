@@ -10,6 +10,7 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 from downloader.tiktok_api import fetch_collection_items, format_video_url
+from downloader.utils import extract_video_id
 
 def main():
     parser = argparse.ArgumentParser(description='Fetch TikTok collection videos using web API')
@@ -32,12 +33,13 @@ def main():
                 existing_urls = {url.strip() for url in f if url.strip()}
             print(f"Found {len(existing_urls):,} existing URLs")
         
-        # Fetch new video IDs starting from cursor
+        # Fetch new video IDs starting from cursor, skipping ones already in the file
         video_ids = fetch_collection_items(
             args.collection_id, 
             cursor=args.cursor, 
             existing_count=len(existing_urls),
-            delay=args.delay
+            delay=args.delay,
+            known_ids={extract_video_id(url) for url in existing_urls} - {None}
         )
         
         if not video_ids:
@@ -9,7 +9,7 @@ import sys
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
-from downloader.tiktok_api import fetch_collections, format_video_url, fetch_collection_items
+from downloader.tiktok_api import fetch_collections, format_video_url, fetch_all_collection_items, MAX_CONCURRENT_COLLECTIONS
 from scripts.count_videos_to_download import process_directory
 
 def main():
@@ -18,6 +18,8 @@ def main():
     parser.add_argument('output_dir', help='Directory to save the collection files into')
     parser.add_argument('--delay', type=float, default=0, help='Delay between requests in seconds (default: 0)')
     parser.add_argument('--directory', help='Path to directory.log file to use instead of fetching collections')
+    parser.add_argument('--refresh', action='store_true', help='Refetch collections even if a recent directory.log exists')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENT_COLLECTIONS, help=f'Number of collections fetched at once, ignored when --delay is set (default: {MAX_CONCURRENT_COLLECTIONS})')
     args = parser.parse_args()
     
     # Extract username from the final directory of the output path
@@ -34,17 +36,25 @@ def main():
             print(f"\nFetching collections for user @{username}...")
             # Pass output directory for saving directory.log
             directory_path = os.path.join(args.output_dir, "directory.log")
-            collections = fetch_collections(username, delay=args.delay, save_to=directory_path)
+            collections = fetch_collections(username, delay=args.delay, save_to=directory_path, force_refresh=args.refresh)
         
         if not collections:
             print("No collections found for this user")
             return 1
                     
+        # Fetch collections' items concurrently, writing each one out as soon as it's ready
+        print(f"\nFetching videos for {len(collections):,} collections...")
+        collection_results = fetch_all_collection_items(
+            [collection['id'] for collection in collections], delay=args.delay,
+            max_workers=max(1, args.concurrency)
+        )
+        
         # Track total videos while processing collections
         total_videos = 0
+        failed_collections = []
         
-        # Process each collection
-        for collection in collections:
+        # Process each collection; results come back in the same order as collections
+        for collection, (_, video_ids) in zip(collections, collection_results):
             collection_name = collection['name']
             collection_id = collection['id']
             safe_name = collection_name
@@ -55,8 +65,10 @@ def main():
             if collection.get('total'):  # Only print total if available
                 print(f"Total expected videos in collection: {collection['total']:,}")
             
-            # Use fetch_collection_items from tiktok_api with delay
-            video_ids = fetch_collection_items(collection_id, delay=args.delay)
+            if video_ids is None:
+                print(f"Skipping collection {collection_name}, its videos could not be fetched")
+                failed_collections.append(collection_name)
+                continue
             total_videos += len(video_ids)
             
             # First try with just the collection name
@@ -73,6 +85,10 @@ def main():
                 
         # Call process_directory instead of count_unique_videos
         process_directory(args.output_dir, collections)
+        
+        if failed_collections:
+            print(f"\nFailed to fetch {len(failed_collections):,} collections: {', '.join(failed_collections)}")
+            return 1
         return 0
             
     except Exception as e:
@@ -300,6 +300,8 @@ def main():
                       help='Skip moving videos to fix missing entries')
     parser.add_argument('--allow-delete', action='store_true',
                       help='Delete extra or corrupted videos found in remote storage')
+    parser.add_argument('--refresh-remote', action='store_true',
+                      help='Re-list remote folders instead of reusing recently cached listings')
 
     args = parser.parse_args()
 
@@ -309,7 +311,7 @@ def main():
 
     validator = Validator(gdrive_base_path=args.gdrive_base_path)
     file_handler = FileHandler(args.input_path)
-    results = validator.validate_downloads(args.input_path)
+    results = validator.validate_downloads(args.input_path, refresh_remote=args.refresh_remote)
     
     if not any(results.values()):
         print("\nNo issues found. All collections are valid.")
@@ -397,9 +399,9 @@ def main():
     else:
         print("\nFinished processing all issues.")
         
-        # Run validation again to show final state
+        # Run validation again to show final state, re-listing the remote folders changed above
         print("\nRunning final validation check...")
-        final_results = validator.validate_downloads(args.input_path)
+        final_results = validator.validate_downloads(args.input_path, refresh_remote=True)
         
         if not any(final_results.values()):
             print("\n✓ All issues have been resolved. Collections are now valid.")
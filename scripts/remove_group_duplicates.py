@@ -18,7 +18,7 @@ from downloader.utils import remove_duplicates_from_groups
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python remove_group_duplicates.py <input_directory> [--dry-run]")
+        print("Usage: python remove_group_duplicates.py <input_directory> [--dry-run] [--verbose]")
         print("\nExample:")
         print("python remove_group_duplicates.py dertarchin")
         print("python remove_group_duplicates.py dertarchin --dry-run")
@@ -26,6 +26,7 @@ def main():
 
     input_dir = sys.argv[1]
     dry_run = "--dry-run" in sys.argv
+    verbose = "--verbose" in sys.argv
     
     if dry_run:
         print("Dry run mode - no changes will be made")
@@ -55,7 +56,7 @@ def main():
         total_removed = 0
         for source_file in text_files:
             source_path = os.path.join(input_dir, source_file)
-            removed = remove_duplicates_from_groups(source_path, input_dir, dry_run=dry_run)
+            removed = remove_duplicates_from_groups(source_path, input_dir, dry_run=dry_run, verbose=verbose)
             total_removed += removed
             
         if total_removed > 0: